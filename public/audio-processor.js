@@ -4,42 +4,27 @@
 // We'll buffer a bit more to be safe and reduce message frequency.
 const CHUNK_SIZE = 1600;
 
+// The sample rate the Live API expects for PCM input.
+const TARGET_SAMPLE_RATE = 16000;
+
 /**
  * AudioProcessor class for an AudioWorklet.
  *
  * This processor is responsible for receiving audio from the microphone,
- * downsampling it to 16kHz, buffering it into larger chunks,
- * converting it to 16-bit PCM format, and posting it back to the main thread.
+ * downsampling it to 16kHz, converting it to 16-bit PCM format, buffering it
+ * into larger chunks, and posting it back to the main thread.
  * This runs in a separate thread, ensuring the main UI thread is not blocked.
  */
 class AudioProcessor extends AudioWorkletProcessor {
   constructor() {
     super();
-    this.buffer = new Float32Array(CHUNK_SIZE);
+    // Samples are written straight into the PCM chunk that gets transferred, so
+    // there is no intermediate float buffer or per-callback allocation.
+    this.buffer = new Int16Array(CHUNK_SIZE);
     this.bufferIndex = 0;
-  }
-
-  /**
-   * Downsamples an input Float32Array from a source sample rate to a target sample rate.
-   * @param {Float32Array} input The audio data to downsample.
-   * @param {number} sourceSampleRate The original sample rate of the audio.
-   * @param {number} targetSampleRate The desired sample rate.
-   * @returns {Float32Array} The downsampled audio data.
-   */
-  downsample(input, sourceSampleRate, targetSampleRate) {
-    if (sourceSampleRate === targetSampleRate) {
-      return input;
-    }
-    const ratio = sourceSampleRate / targetSampleRate;
-    const newLength = Math.floor(input.length / ratio);
-    const result = new Float32Array(newLength);
-    let inputIndex = 0;
-    for (let i = 0; i < newLength; i++) {thinkingBudget: 0
-      // A simple downsampling algorithm (averaging can be better but this is faster).
-      result[i] = input[Math.floor(inputIndex)];
-      inputIndex += ratio;
-    }
-    return result;
+    // Fractional read position carried between 128-sample render quanta, so the
+    // output rate stays exact when the source rate isn't a multiple of 16kHz.
+    this.inputPosition = 0;
   }
 
   /**
@@ -56,35 +41,34 @@ class AudioProcessor extends AudioWorkletProcessor {
       return true; // Keep processor alive.
     }
 
-    // Downsample the incoming 128-sample frame to our target 16kHz rate.
+    // Downsample to our target 16kHz rate by stepping through the input.
     // `sampleRate` is a global variable available in the AudioWorkletGlobalScope.
-    const downsampledData = this.downsample(channelData, sampleRate, 16000);
+    // A simple downsampling algorithm (averaging can be better but this is faster).
+    const ratio = sampleRate / TARGET_SAMPLE_RATE;
+    let position = this.inputPosition;
 
-    // Add the downsampled data to our buffer.
-    for (let i = 0; i < downsampledData.length; i++) {
-      this.buffer[this.bufferIndex++] = downsampledData[i];
+    while (position < channelData.length) {
+      // Convert each picked sample to 16-bit PCM as it is buffered.
+      const s = Math.max(-1, Math.min(1, channelData[Math.floor(position)]));
+      this.buffer[this.bufferIndex++] = s < 0 ? s * 0x8000 : s * 0x7fff;
+      position += ratio;
 
       // When our buffer is full, send it to the main thread.
       if (this.bufferIndex === CHUNK_SIZE) {
-        // Convert the Float32Array to a 16-bit PCM Int16Array.
-        const pcmData = new Int16Array(this.buffer.length);
-        for (let j = 0; j < this.buffer.length; j++) {
-          const s = Math.max(-1, Math.min(1, this.buffer[j]));
-          pcmData[j] = s < 0 ? s * 0x8000 : s * 0x7fff;
-        }
-
         // Post the data, transferring ownership of the underlying ArrayBuffer
         // to the main thread to avoid copying.
-        this.port.postMessage(pcmData, [pcmData.buffer]);
+        this.port.postMessage(this.buffer, [this.buffer.buffer]);
 
-        // Reset the buffer index to start filling it again.
+        // The transferred buffer is detached; start filling a fresh one.
+        this.buffer = new Int16Array(CHUNK_SIZE);
         this.bufferIndex = 0;
       }
     }
 
+    this.inputPosition = position - channelData.length;
     return true; // Keep the processor running.
   }
 }
 
 // Register the processor to be used in the AudioWorklet.
-registerProcessor('audio-processor', AudioProcessor); 
\ No newline at end of file
+registerProcessor('audio-processor', AudioProcessor);
@@ -0,0 +1,58 @@
+// Worker that JPEG-encodes camera frames off the main thread.
+// The main thread transfers an ImageBitmap of the current video frame and gets
+// back the base64 JPEG payload that the Live API expects.
+
+// Stay well under the engine's argument limit when building the binary string.
+const BASE64_CHUNK_SIZE = 0x8000;
+
+// Native encoder (Uint8Array.prototype.toBase64) where the engine ships it.
+const nativeToBase64 = Uint8Array.prototype.toBase64;
+
+let canvas = null;
+let context = null;
+
+/**
+ * Encodes raw bytes as a base64 string.
+ * @param {Uint8Array} bytes The bytes to encode.
+ * @returns {string} The base64-encoded data.
+ */
+function bytesToBase64(bytes) {
+  if (nativeToBase64) {
+    return nativeToBase64.call(bytes);
+  }
+  let binary = '';
+  for (let i = 0; i < bytes.length; i += BASE64_CHUNK_SIZE) {
+    binary += String.fromCharCode.apply(null, bytes.subarray(i, i + BASE64_CHUNK_SIZE));
+  }
+  return btoa(binary);
+}
+
+/**
+ * Handles an encode request.
+ * Expects `{ id, bitmap, width, height, quality }` and replies with
+ * `{ id, data }` on success or `{ id, error }` on failure.
+ */
+self.onmessage = async (event) => {
+  const { id, bitmap, width, height, quality } = event.data;
+
+  try {
+    // Reuse one canvas across frames; only resize it when the frame size changes.
+    if (!canvas) {
+      canvas = new OffscreenCanvas(width, height);
+      context = canvas.getContext('2d');
+    } else if (canvas.width !== width || canvas.height !== height) {
+      canvas.width = width;
+      canvas.height = height;
+    }
+
+    context.drawImage(bitmap, 0, 0, width, height);
+    bitmap.close();
+
+    const blob = await canvas.convertToBlob({ type: 'image/jpeg', quality });
+    const data = bytesToBase64(new Uint8Array(await blob.arrayBuffer()));
+    self.postMessage({ id, data });
+  } catch (e) {
+    bitmap.close();
+    self.postMessage({ id, error: e.message });
+  }
+};
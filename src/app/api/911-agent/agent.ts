@@ -0,0 +1,11 @@
+// Shared 911 agent logic, used by the /api/911-agent route and called in-process
+// by /api/call911 so an emergency call doesn't pay for a loopback HTTP request.
+export async function dispatch911Agent() {
+  console.log('✅ 911 Agent called');
+  // This agent just returns a constant JSON response.
+  return {
+    status: 'dispatched',
+    unit: 'Police Unit 123',
+    eta_minutes: 5
+  };
+}
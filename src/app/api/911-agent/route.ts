@@ -1,11 +1,6 @@
 import { NextResponse } from 'next/server';
+import { dispatch911Agent } from './agent';
 
 export async function POST(request: Request) {
-  console.log('✅ 911 Agent called');
-  // This agent just returns a constant JSON response.
-  return NextResponse.json({ 
-    status: 'dispatched',
-    unit: 'Police Unit 123',
-    eta_minutes: 5
-  });
-} 
\ No newline at end of file
+  return NextResponse.json(await dispatch911Agent());
+}
@@ -1,29 +1,14 @@
 import { NextResponse } from 'next/server';
+import { dispatch911Agent } from '../911-agent/agent';
 
 export async function POST(request: Request) {
   try {
     const payload = await request.json();
     console.log('✅ 911 API CALLED. Payload:', JSON.stringify(payload, null, 2));
     
-    // Forward the call to the 911 agent
-    const url = new URL(request.url);
-    const agentUrl = `${url.protocol}//${url.host}/api/911-agent`;
-
-    console.log(`✅ Calling 911 Agent at: ${agentUrl}`);
-
-    const agentResponse = await fetch(agentUrl, {
-      method: 'POST',
-      headers: {
-        'Content-Type': 'application/json',
-      },
-      body: JSON.stringify(payload),
-    });
-
-    if (!agentResponse.ok) {
-      throw new Error(`911 Agent call failed with status: ${agentResponse.status}`);
-    }
-
-    const agentData = await agentResponse.json();
+    // Dispatch to the 911 agent in-process rather than over a loopback HTTP request
+    console.log('✅ Calling 911 Agent');
+    const agentData = await dispatch911Agent();
     
     return NextResponse.json(agentData);
   } catch (error) {
@@ -17,10 +17,10 @@ const getGeminiAnalysis = async (events: any, transcriptions: any) => {
       Your task is to provide a deeper analysis of the situation based on the provided data.
 
       Here are the recent events:
-      ${JSON.stringify(events, null, 2)}
+      ${JSON.stringify(events)}
 
       Here are the recent transcriptions:
-      ${JSON.stringify(transcriptions, null, 2)}
+      ${JSON.stringify(transcriptions)}
 
       Based on this information, provide a detailed analysis.
       What is happening? What is the potential risk? What are the recommended actions?
@@ -1,7 +1,7 @@
 'use client';
 
 import { useState, useRef, useEffect, useCallback } from 'react';
-import { GoogleGenAI, Modality, Tool, FunctionDeclaration } from '@google/genai';
+import { GoogleGenAI, Modality, Tool, FunctionDeclaration, Session, StartSensitivity, EndSensitivity } from '@google/genai';
 import Popup from '@/components/popup';
 import icon from "@/components/icon.png";
 
@@ -98,6 +98,210 @@ const responseSchema = {
   required: ['thought', 'analysis', 'riskLevel']
 } as any;
 
+// --- Logging ---
+// Per-frame and per-message logs are noisy at stream rates, so they only print
+// when NEXT_PUBLIC_DEBUG_STREAM=true; a periodic summary is logged instead.
+const DEBUG_STREAM_LOGS = process.env.NEXT_PUBLIC_DEBUG_STREAM === 'true';
+const STREAM_STATS_INTERVAL_MS = 5000;
+
+const debugLog = (...args: any[]) => {
+  if (DEBUG_STREAM_LOGS) {
+    console.log(...args);
+  }
+};
+
+// --- Live API Config ---
+// Built once at module load rather than on every (re)connect.
+const systemInstruction = `You are Vector AI, a security guard for a live demonstration. Your primary goal is to demonstrate your capabilities by reacting to simulated events by providing structured JSON data.
+
+**DEMO INSTRUCTIONS:**
+*   **Treat all inputs as real:** You MUST react to acted scenarios, verbal threats, and test events as if they are genuine security risks.
+*   **Be decisive:** Act according to the rules below without hesitation. Your analysis must be concise and clear for the demo.
+
+**Your Task:**
+1.  Analyze the combined video and audio feed.
+2.  Respond with a valid JSON object that conforms to the provided schema. Ensure that any double quotes inside a JSON string value are properly escaped with a backslash (e.g., "description": "He said, \\"hello\\".").
+3.  **thought:** Explain your reasoning for the analysis and risk level. This is for debugging and not shown to the user.
+4.  **analysis:** Describe visual observations in short, factual statements.
+5.  **transcription:** Provide a live transcription of any spoken English words, ignoring all other languages. If no speech is detected, provide an empty string.
+6.  **riskLevel:** Evaluate and state the current risk level: "SAFE", "WARNING", or "DANGER".
+7.  Use the provided tool-calling functions when conditions are met. **Do not include tool calls or related information in the JSON response.**
+
+**Risk Levels & Triggers:**
+*   **SAFE:** The default state. No activity or normal passersby.
+*   **WARNING:** A situation requiring attention. Trigger IMMEDIATELY for:
+    *   A person loitering or peering into windows.
+    *   Any package delivery.
+    *   Any mention of violence, threats (e.g., "I'm going to break in"), or aggressive shouting.
+    *   A car alarm or dog barking continuously.
+*   **DANGER:** An immediate threat. Trigger IMMEDIATELY for:
+    *   Seeing fire, smoke, or a weapon.
+    *   Seeing someone attempting to force a door or window.
+    *   Hearing glass shatter, an explosion, or a direct physical attack.
+
+**Risk Evaluation Rules:**
+*   **Constant Re-evaluation:** You MUST re-evaluate the risk level with every piece of new information from the audio and video stream.
+*   **Risk Downgrade:** If a threat has clearly passed (e.g., a person leaves, a noise stops), you MUST downgrade the risk level. For example, after a package is delivered and the delivery person has left the scene, the risk should return from WARNING to SAFE.
+
+**Tool Rules:**
+*   \`sendNotification\`: Use ONLY for a package delivery (sets WARNING).
+*   \`call911\`: Use ONLY for a DANGER-level event. Call the function with the \`reason\` parameter detailing the emergency.`;
+
+const liveConfig = {
+  responseModalities: [Modality.TEXT],
+  responseJsonSchema: responseSchema,
+  temperature: 0,
+  thinkingBudget: 0,
+  systemInstruction,
+  // Aggressive voice activity detection: short utterances start and end turns
+  // quickly instead of waiting out the default silence window.
+  realtimeInputConfig: {
+    automaticActivityDetection: {
+      startOfSpeechSensitivity: StartSensitivity.START_SENSITIVITY_HIGH,
+      endOfSpeechSensitivity: EndSensitivity.END_SENSITIVITY_HIGH,
+      prefixPaddingMs: 50,
+      silenceDurationMs: 250,
+    },
+  },
+  toolConfig: {
+    functionDeclarations: [call911Tool, sendNotificationTool, doorTool],
+  },
+};
+
+// --- Deep Analysis ---
+// Events and transcriptions are batched into back-to-back windows of this length
+// and sent to Gemini Pro as one request per window.
+const DEEP_ANALYSIS_INTERVAL_MS = 20000;
+
+// --- Frame Capture ---
+// Gemini samples video at 1 fps and gains nothing from frames larger than 720p,
+// so frames are captured at that rate and scaled down before JPEG encoding.
+const FRAME_INTERVAL_MS = 1000;
+const MAX_FRAME_WIDTH = 1280;
+const MAX_FRAME_HEIGHT = 720;
+const FRAME_JPEG_QUALITY = 0.75;
+
+// --- Response Validation ---
+interface AnalysisResponse {
+  thought?: string;
+  analysis?: string;
+  transcription?: string;
+  riskLevel?: RiskLevel;
+}
+
+const RISK_LEVELS: ReadonlySet<string> = new Set<RiskLevel>(['SAFE', 'WARNING', 'DANGER']);
+
+// Checks a parsed model response against the response schema in one pass. Fields
+// of the wrong type (or an unknown risk level) are dropped rather than trusted.
+const parseAnalysisResponse = (json: unknown): AnalysisResponse | null => {
+  if (typeof json !== 'object' || json === null || Array.isArray(json)) return null;
+  const { thought, analysis, transcription, riskLevel } = json as Record<string, unknown>;
+  return {
+    thought: typeof thought === 'string' ? thought : undefined,
+    analysis: typeof analysis === 'string' ? analysis : undefined,
+    transcription: typeof transcription === 'string' ? transcription : undefined,
+    riskLevel: typeof riskLevel === 'string' && RISK_LEVELS.has(riskLevel) ? riskLevel as RiskLevel : undefined,
+  };
+};
+
+// --- Partial Analysis ---
+// Pulls the (possibly unterminated) "analysis" string out of a JSON block that is
+// still streaming in, so the UI can show it before the closing fence arrives.
+const PARTIAL_ANALYSIS_PATTERN = /"analysis"\s*:\s*"((?:[^"\\]|\\.)*)/;
+
+const extractPartialAnalysis = (buffer: string) => {
+  const match = PARTIAL_ANALYSIS_PATTERN.exec(buffer);
+  if (!match) return '';
+  try {
+    return JSON.parse(`"${match[1]}"`) as string;
+  } catch {
+    // Cut off mid-escape (e.g. half of a \u sequence); show it as-is for now
+    return match[1];
+  }
+};
+
+// --- Media Encoding ---
+// The Live API takes media as base64 strings. Encode straight from the raw bytes
+// instead of building a data: URL and splitting the prefix back off.
+const BASE64_CHUNK_SIZE = 0x8000; // Stay well under the engine's argument limit
+
+// Native encoder (Uint8Array.prototype.toBase64) where the engine ships it; it
+// skips building an intermediate binary string entirely.
+const nativeToBase64 = (Uint8Array.prototype as any).toBase64 as ((this: Uint8Array) => string) | undefined;
+
+const bytesToBase64 = (bytes: Uint8Array) => {
+  if (nativeToBase64) {
+    return nativeToBase64.call(bytes);
+  }
+  let binary = '';
+  for (let i = 0; i < bytes.length; i += BASE64_CHUNK_SIZE) {
+    binary += String.fromCharCode.apply(null, bytes.subarray(i, i + BASE64_CHUNK_SIZE) as any);
+  }
+  return btoa(binary);
+};
+
+const MAX_COALESCED_AUDIO_CHUNKS = 16;
+// sendRealtimeInput is synchronous, so the writer drains the outbox in a single
+// pass and never stalls on the network; the outbox only grows while the main
+// thread is frozen. This cap (~6.4 s of 100 ms chunks) bounds that case.
+const MAX_PENDING_AUDIO_CHUNKS = 64;
+
+const concatPcm = (chunks: Int16Array[]) => {
+  const merged = new Int16Array(chunks.reduce((length, chunk) => length + chunk.length, 0));
+  let offset = 0;
+  for (const chunk of chunks) {
+    merged.set(chunk, offset);
+    offset += chunk.length;
+  }
+  return merged;
+};
+
+// --- Frame Hashing ---
+// Static scenes produce near-identical frames, so each capture is reduced to a
+// 64-bit difference hash (dHash) and skipped when it barely differs from the last
+// frame actually sent to the Live API.
+const FRAME_HASH_WIDTH = 9;
+const FRAME_HASH_HEIGHT = 8;
+const FRAME_HASH_MAX_DISTANCE = 5; // Hamming distance (in bits) treated as "unchanged"
+const STATIC_FRAME_REFRESH_MS = 10000; // Resend an unchanged scene at least this often
+
+const computeFrameHash = (source: CanvasImageSource, hashCanvas: HTMLCanvasElement): Uint8Array | null => {
+  hashCanvas.width = FRAME_HASH_WIDTH;
+  hashCanvas.height = FRAME_HASH_HEIGHT;
+  const ctx = hashCanvas.getContext('2d', { willReadFrequently: true });
+  if (!ctx) return null;
+
+  ctx.drawImage(source, 0, 0, FRAME_HASH_WIDTH, FRAME_HASH_HEIGHT);
+  const pixels = ctx.getImageData(0, 0, FRAME_HASH_WIDTH, FRAME_HASH_HEIGHT).data;
+
+  // One bit per horizontally adjacent pixel pair: is the left pixel brighter?
+  const hash = new Uint8Array(8);
+  for (let y = 0; y < FRAME_HASH_HEIGHT; y++) {
+    let row = 0;
+    for (let x = 0; x < FRAME_HASH_WIDTH - 1; x++) {
+      const left = (y * FRAME_HASH_WIDTH + x) * 4;
+      const right = left + 4;
+      const leftLuma = pixels[left] * 299 + pixels[left + 1] * 587 + pixels[left + 2] * 114;
+      const rightLuma = pixels[right] * 299 + pixels[right + 1] * 587 + pixels[right + 2] * 114;
+      row = (row << 1) | (leftLuma > rightLuma ? 1 : 0);
+    }
+    hash[y] = row;
+  }
+  return hash;
+};
+
+const frameHashDistance = (a: Uint8Array, b: Uint8Array) => {
+  let distance = 0;
+  for (let i = 0; i < a.length; i++) {
+    let diff = a[i] ^ b[i];
+    while (diff) {
+      distance += diff & 1;
+      diff >>= 1;
+    }
+  }
+  return distance;
+};
+
 // --- Component ---
 export default function SecurityCamera() {
   const [riskLevel, setRiskLevel] = useState<RiskLevel>('SAFE');
@@ -106,6 +310,7 @@ export default function SecurityCamera() {
   const [status, setStatus] = useState<ConnectionStatus>('Disconnected');
   const [error, setError] = useState<string | null>(null);
   const [analyserNode, setAnalyserNode] = useState<AnalyserNode | null>(null);
+  const [pendingAnalysis, setPendingAnalysis] = useState('');
 
   const videoRef = useRef<HTMLVideoElement>(null);
   const mediaStreamRef = useRef<MediaStream | null>(null);
@@ -113,13 +318,26 @@ export default function SecurityCamera() {
   const responseQueueRef = useRef<any[]>([]);
   const isProcessingQueueRef = useRef(false);
   const isStreamingRef = useRef(false);
+  const streamGenerationRef = useRef(0); // Bumped on every start to spot stale sessions
   const audioContextRef = useRef<AudioContext | null>(null);
   const audioWorkletNodeRef = useRef<AudioWorkletNode | null>(null);
   const transcriptionsRef = useRef<HTMLDivElement>(null);
   const analysisRef = useRef<HTMLDivElement>(null);
   const eventsRef = useRef<HTMLDivElement>(null);
   const partialJsonResponse = useRef('');
+  const audioOutboxRef = useRef<Int16Array[]>([]);
+  const isAudioFlushPendingRef = useRef(false);
+  const hashCanvasRef = useRef<HTMLCanvasElement | null>(null);
+  const lastSentFrameHashRef = useRef<Uint8Array | null>(null);
+  const lastSentFrameAtRef = useRef(0);
+  const isCapturingFrameRef = useRef(false);
+  const frameEncoderRef = useRef<Worker | null>(null);
+  const pendingEncodesRef = useRef(new Map<number, { resolve: (data: string | null) => void; reject: (e: Error) => void }>());
+  const nextEncodeIdRef = useRef(0);
+  const isFrameEncoderDisabledRef = useRef(false);
   const [isPopupOpen, setIsPopupOpen] = useState(false);
+  const nextEntryIdRef = useRef(0); // Monotonic ids for transcription and event entries
+  const streamStatsRef = useRef({ framesSent: 0, framesSkipped: 0, framesDropped: 0, audioChunksSent: 0 });
 
   // Refs to hold the current state for access in intervals
   const eventsStateRef = useRef<Event[]>(events);
@@ -136,15 +354,18 @@ export default function SecurityCamera() {
 
   // --- Send data to Gemini Pro for analysis ---
   useEffect(() => {
+    // Both lists are append-only, so each window is simply everything added since
+    // the previous one: no overlap between requests and nothing falls in a gap.
+    let eventsCursor = eventsStateRef.current.length;
+    let transcriptionsCursor = transcriptionsStateRef.current.length;
+
     const intervalId = setInterval(async () => {
+      const recentEvents = eventsStateRef.current.slice(eventsCursor);
+      const recentTranscriptions = transcriptionsStateRef.current.slice(transcriptionsCursor);
+      eventsCursor = eventsStateRef.current.length;
+      transcriptionsCursor = transcriptionsStateRef.current.length;
       if (!isStreamingRef.current) return;
 
-      const now = new Date();
-      const twentySecondsAgo = new Date(now.getTime() - 10000);
-
-      const recentEvents = eventsStateRef.current.filter(e => e.timestamp > twentySecondsAgo);
-      const recentTranscriptions = transcriptionsStateRef.current.filter(t => t.timestamp > twentySecondsAgo);
-
       if (recentEvents.length === 0 && recentTranscriptions.length === 0) {
         return;
       }
@@ -173,15 +394,23 @@ export default function SecurityCamera() {
       } catch (error) {
         console.error('[DEBUG] Exception sending data to Gemini Pro:', error);
       }
-    }, 20000);
+    }, DEEP_ANALYSIS_INTERVAL_MS);
 
     return () => clearInterval(intervalId);
   }, []); // Empty dependency array ensures this runs only once on mount
 
+  // Keep the streaming analysis in view as it grows
+  useEffect(() => {
+    if (pendingAnalysis && analysisRef.current) {
+      analysisRef.current.scrollTop = analysisRef.current.scrollHeight;
+    }
+  }, [pendingAnalysis]);
+
   // --- Utility Functions ---
   const addTranscription = useCallback((text: string, type: Transcription['type']) => {
-    const id = `transcription-${Date.now()}-${Math.random()}`;
-    setTranscriptions((prev) => [...prev, { id, text, type, timestamp: new Date() }]);
+    const id = `transcription-${nextEntryIdRef.current++}`;
+    const timestamp = new Date();
+    setTranscriptions((prev) => [...prev, { id, text, type, timestamp }]);
     // Auto-scroll to bottom after state update
     setTimeout(() => {
       let refToScroll;
@@ -200,8 +429,9 @@ export default function SecurityCamera() {
   }, []);
 
   const addEvent = useCallback((text: string, type: Event['type']) => {
-    const id = `event-${Date.now()}-${Math.random()}`;
-    setEvents((prev) => [...prev, { id, text, type, timestamp: new Date() }]);
+    const id = `event-${nextEntryIdRef.current++}`;
+    const timestamp = new Date();
+    setEvents((prev) => [...prev, { id, text, type, timestamp }]);
     // Auto-scroll to bottom after state update
     setTimeout(() => {
       if (eventsRef.current) {
@@ -218,11 +448,16 @@ export default function SecurityCamera() {
       return;
     }
     isProcessingQueueRef.current = true;
-    console.log(`[DEBUG] Processing queue. Size: ${responseQueueRef.current.length}`);
+    debugLog(`[DEBUG] Processing queue. Size: ${responseQueueRef.current.length}`);
 
-    const processJson = (json: any) => {
-      console.log('[DEBUG] JSON response processed:', json);
-      const { thought, analysis, transcription, riskLevel: newRiskLevel } = json;
+    const processJson = (json: unknown) => {
+      const response = parseAnalysisResponse(json);
+      if (!response) {
+        console.error('[DEBUG] Ignoring JSON response that does not match the schema:', json);
+        return;
+      }
+      console.log('[DEBUG] JSON response processed:', response);
+      const { thought, analysis, transcription, riskLevel: newRiskLevel } = response;
 
       if (transcription) {
         addTranscription(transcription, 'transcription');
@@ -234,9 +469,9 @@ export default function SecurityCamera() {
       if (newRiskLevel) {
         setRiskLevel(prevRiskLevel => {
           if (prevRiskLevel !== newRiskLevel) {
-            addEvent(`Risk level changed to ${newRiskLevel}`, newRiskLevel === 'DANGER' ? 'DANGER' : newRiskLevel === 'WARNING' ? 'WARNING' : 'SAFE');
+            addEvent(`Risk level changed to ${newRiskLevel}`, newRiskLevel);
           }
-          return newRiskLevel as RiskLevel;
+          return newRiskLevel;
         });
       }
     };
@@ -246,20 +481,29 @@ export default function SecurityCamera() {
       if (!message) continue;
 
       try {
-        console.log('[DEBUG] Processing message:', JSON.stringify(message, null, 2));
-
+        if (message.serverContent?.interrupted) {
+          // Barge-in cancelled the model's turn; drop the truncated block so the
+          // next block's opening fence isn't mistaken for its closing one.
+          debugLog('[DEBUG] Model turn interrupted, discarding partial response.');
+          partialJsonResponse.current = '';
+          setPendingAnalysis('');
+        }
         if (message.serverContent?.modelTurn?.parts) {
           for (const part of message.serverContent.modelTurn.parts) {
             if (part.functionCall) {
               console.log('[DEBUG] Function call detected:', part.functionCall);
-              await handleToolCall(part.functionCall.name, part.functionCall.args);
+              // Run the tool alongside the stream rather than stalling every queued
+              // message behind its HTTP round-trip; handleToolCall reports its own errors.
+              void handleToolCall(part.functionCall.name, part.functionCall.args);
               partialJsonResponse.current = ''; // Clear buffer on tool call
+              setPendingAnalysis('');
               continue;
             }
 
             if (part.json) {
               processJson(part.json);
               partialJsonResponse.current = '';
+              setPendingAnalysis('');
             } else if (part.text) {
               partialJsonResponse.current += part.text;
 
@@ -297,6 +541,8 @@ export default function SecurityCamera() {
               }
               
               partialJsonResponse.current = buffer;
+              // Stream the analysis of the block still in flight to the UI
+              setPendingAnalysis(extractPartialAnalysis(buffer));
             }
           }
         }
@@ -307,6 +553,7 @@ export default function SecurityCamera() {
         addTranscription(errorMessage, 'error');
         addEvent(errorMessage, 'error');
         partialJsonResponse.current = '';
+        setPendingAnalysis('');
       }
     }
 
@@ -393,69 +640,202 @@ export default function SecurityCamera() {
   };
 
   // --- Core Streaming Logic ---
-  const sendAudio = useCallback(async (pcmData: Int16Array) => {
+  // A single writer drains the audio outbox, so chunks that pile up while the
+  // main thread is busy go out as one message instead of a burst of sends.
+  const flushAudio = useCallback(async () => {
+    while (audioOutboxRef.current.length > 0) {
+      if (!isStreamingRef.current || !liveSessionRef.current) {
+        audioOutboxRef.current = [];
+        break;
+      }
+      const chunks = audioOutboxRef.current.splice(0, MAX_COALESCED_AUDIO_CHUNKS);
+      const pcmData = chunks.length === 1 ? chunks[0] : concatPcm(chunks);
+      const base64Audio = bytesToBase64(new Uint8Array(pcmData.buffer, pcmData.byteOffset, pcmData.byteLength));
+
+      try {
+        await liveSessionRef.current.sendRealtimeInput({
+          audio: { data: base64Audio, mimeType: 'audio/pcm;rate=16000' },
+        });
+        streamStatsRef.current.audioChunksSent += chunks.length;
+      } catch (e: any) {
+        // Don't log every audio error to avoid spamming the user
+        console.error(`Failed to send audio chunk: ${e.message}`);
+      }
+    }
+    isAudioFlushPendingRef.current = false;
+  }, []);
+
+  const sendAudio = useCallback((pcmData: Int16Array) => {
     if (!isStreamingRef.current || !liveSessionRef.current) {
       return;
     }
-    // Convert to base64
-    const base64Audio = btoa(String.fromCharCode.apply(null, new Uint8Array(pcmData.buffer) as any));
-
-    try {
-      await liveSessionRef.current.sendRealtimeInput({
-        audio: { data: base64Audio, mimeType: 'audio/pcm;rate=16000' },
-      });
-    } catch (e: any) {
-      // Don't log every audio error to avoid spamming the user
-      console.error(`Failed to send audio chunk: ${e.message}`);
+    audioOutboxRef.current.push(pcmData);
+    if (audioOutboxRef.current.length > MAX_PENDING_AUDIO_CHUNKS) {
+      // Main thread was frozen for seconds; shed the oldest audio rather than
+      // sending a long stale burst once it recovers
+      audioOutboxRef.current.shift();
     }
+    if (!isAudioFlushPendingRef.current) {
+      isAudioFlushPendingRef.current = true;
+      setTimeout(flushAudio, 0);
+    }
+  }, [flushAudio]);
+
+  // --- Frame Encoding Worker ---
+  // Lazily spawn the encoder worker; returns null where workers or OffscreenCanvas
+  // are unavailable so callers can fall back to encoding on the main thread.
+  const getFrameEncoder = useCallback(() => {
+    if (frameEncoderRef.current) return frameEncoderRef.current;
+    if (isFrameEncoderDisabledRef.current) return null;
+    if (typeof Worker === 'undefined' || typeof OffscreenCanvas === 'undefined') return null;
+
+    const worker = new Worker('/frame-encoder.js');
+    worker.onmessage = (event: MessageEvent<{ id: number; data?: string; error?: string }>) => {
+      const { id, data, error } = event.data;
+      const pending = pendingEncodesRef.current.get(id);
+      if (!pending) return;
+      pendingEncodesRef.current.delete(id);
+      if (error !== undefined) {
+        pending.reject(new Error(error));
+      } else {
+        pending.resolve(data ?? null);
+      }
+    };
+    worker.onerror = (event) => {
+      // The worker itself failed (e.g. it could not load); stop using it for good
+      console.error('[DEBUG] Frame encoder worker failed, encoding on main thread:', event.message);
+      worker.terminate();
+      frameEncoderRef.current = null;
+      isFrameEncoderDisabledRef.current = true;
+      pendingEncodesRef.current.forEach(({ reject }) => reject(new Error('Frame encoder failed')));
+      pendingEncodesRef.current.clear();
+    };
+    frameEncoderRef.current = worker;
+    return worker;
   }, []);
 
-  const captureAndSendFrame = useCallback(async (frameCount = 1) => {
+  const encodeFrameInWorker = useCallback((worker: Worker, bitmap: ImageBitmap, width: number, height: number) => {
+    const id = nextEncodeIdRef.current++;
+    return new Promise<string | null>((resolve, reject) => {
+      pendingEncodesRef.current.set(id, { resolve, reject });
+      worker.postMessage({ id, bitmap, width, height, quality: FRAME_JPEG_QUALITY }, [bitmap]);
+    });
+  }, []);
+
+  const captureFrames = useCallback(async (frameCount: number) => {
     for (let i = 0; i < frameCount; i++) {
         if (!isStreamingRef.current || !liveSessionRef.current) {
             return;
         }
 
         if (!videoRef.current || videoRef.current.readyState < 2) {
-            console.log(`[DEBUG] Video not ready. State: ${videoRef.current?.readyState}`);
+            debugLog(`[DEBUG] Video not ready. State: ${videoRef.current?.readyState}`);
             return;
         }
         
-        console.log(`[DEBUG] Capturing frame ${i + 1}/${frameCount}. Video dimensions: ${videoRef.current.videoWidth}x${videoRef.current.videoHeight}`);
+        // Skip frames that are visually unchanged since the last one we sent
+        if (!hashCanvasRef.current) {
+          hashCanvasRef.current = document.createElement('canvas');
+        }
+        const frameHash = computeFrameHash(videoRef.current, hashCanvasRef.current);
+        const now = Date.now();
+        if (
+          frameHash &&
+          lastSentFrameHashRef.current &&
+          now - lastSentFrameAtRef.current < STATIC_FRAME_REFRESH_MS &&
+          frameHashDistance(frameHash, lastSentFrameHashRef.current) <= FRAME_HASH_MAX_DISTANCE
+        ) {
+          streamStatsRef.current.framesSkipped++;
+          debugLog(`[DEBUG] Frame ${i + 1}/${frameCount} unchanged, skipping.`);
+          if (i < frameCount - 1) {
+            await wait(FRAME_INTERVAL_MS);
+          }
+          continue;
+        }
 
-        const canvas = document.createElement('canvas');
-        canvas.width = videoRef.current.videoWidth;
-        canvas.height = videoRef.current.videoHeight;
-        const ctx = canvas.getContext('2d');
-        if (!ctx) return;
-    
-        ctx.drawImage(videoRef.current, 0, 0, canvas.width, canvas.height);
-        const blob = await new Promise<Blob | null>(resolve => canvas.toBlob(resolve, 'image/jpeg', 0.8));
-    
-        if (blob) {
-        const reader = new FileReader();
-        reader.onloadend = async () => {
-            try {
-            const base64Data = (reader.result as string).split(',')[1];
+        debugLog(`[DEBUG] Capturing frame ${i + 1}/${frameCount}. Video dimensions: ${videoRef.current.videoWidth}x${videoRef.current.videoHeight}`);
+
+        const { videoWidth, videoHeight } = videoRef.current;
+        const scale = Math.min(1, MAX_FRAME_WIDTH / videoWidth, MAX_FRAME_HEIGHT / videoHeight);
+
+        const width = Math.round(videoWidth * scale);
+        const height = Math.round(videoHeight * scale);
+
+        const video = videoRef.current;
+        const encodeOnMainThread = async () => {
+            const canvas = document.createElement('canvas');
+            canvas.width = width;
+            canvas.height = height;
+            const ctx = canvas.getContext('2d');
+            if (!ctx) return null;
+
+            ctx.drawImage(video, 0, 0, width, height);
+            const blob = await new Promise<Blob | null>(resolve => canvas.toBlob(resolve, 'image/jpeg', FRAME_JPEG_QUALITY));
+            return blob && bytesToBase64(new Uint8Array(await blob.arrayBuffer()));
+        };
+
+        try {
+            let base64Data: string | null;
+            const frameEncoder = getFrameEncoder();
+            if (frameEncoder) {
+                try {
+                    // JPEG + base64 encoding runs in the worker; only the bitmap grab stays here.
+                    // The browser scales while snapshotting, so the worker draws 1:1 and
+                    // only the downscaled pixels are transferred.
+                    const bitmap = await createImageBitmap(video, {
+                        resizeWidth: width,
+                        resizeHeight: height,
+                        resizeQuality: 'low',
+                    });
+                    base64Data = await encodeFrameInWorker(frameEncoder, bitmap, width, height);
+                } catch (e) {
+                    // The worker died with this frame in flight; encode it here instead
+                    // of reporting a failed send.
+                    if (!isFrameEncoderDisabledRef.current) throw e;
+                    base64Data = await encodeOnMainThread();
+                }
+            } else {
+                base64Data = await encodeOnMainThread();
+            }
+
+            if (base64Data && liveSessionRef.current) {
             await liveSessionRef.current.sendRealtimeInput({
                 image: { data: base64Data, mimeType: 'image/jpeg' },
             });
-            console.log(`[DEBUG] Frame ${i + 1}/${frameCount} sent to Live API.`);
-            } catch (e: any) {
+            streamStatsRef.current.framesSent++;
+            // Only a frame that actually went out becomes the dedup reference
+            lastSentFrameHashRef.current = frameHash;
+            lastSentFrameAtRef.current = now;
+            debugLog(`[DEBUG] Frame ${i + 1}/${frameCount} sent to Live API.`);
+            }
+        } catch (e: any) {
             const errorMsg = `Failed to send video frame: ${e.message}`;
             console.error(errorMsg, e);
             setError(errorMsg);
             addTranscription(errorMsg, 'error');
             // Don't stop streaming for a single failed frame
-            }
-        };
-        reader.readAsDataURL(blob);
         }
         if (i < frameCount - 1) {
-            await wait(500); // Wait between frames
+            await wait(FRAME_INTERVAL_MS); // Keep bursts at the sampled frame rate
         }
     }
-  }, [addTranscription, setError, wait]);
+  }, [addTranscription, setError, wait, getFrameEncoder, encodeFrameInWorker]);
+
+  const captureAndSendFrame = useCallback(async (frameCount = 1) => {
+    // Drop this tick if the previous capture is still encoding or sending; the next
+    // tick grabs a fresh frame, so a slow encoder never builds up a backlog.
+    if (isCapturingFrameRef.current) {
+      streamStatsRef.current.framesDropped++;
+      debugLog('[DEBUG] Previous frame still in flight, dropping this one.');
+      return;
+    }
+    isCapturingFrameRef.current = true;
+    try {
+      await captureFrames(frameCount);
+    } finally {
+      isCapturingFrameRef.current = false;
+    }
+  }, [captureFrames]);
 
   const stopStreaming = useCallback(() => {
     console.log('[DEBUG] stopStreaming called - checking if already stopped');
@@ -485,6 +865,11 @@ export default function SecurityCamera() {
     }
     responseQueueRef.current = [];
     isProcessingQueueRef.current = false;
+    audioOutboxRef.current = [];
+    partialJsonResponse.current = '';
+    setPendingAnalysis('');
+    lastSentFrameHashRef.current = null;
+    lastSentFrameAtRef.current = 0;
     addTranscription('Security feed stopped.', 'status');
     console.log('[DEBUG] Stream stopped successfully');
   }, [addTranscription, addEvent]);
@@ -499,10 +884,68 @@ export default function SecurityCamera() {
     setError(null);
     setStatus('Connecting');
     isStreamingRef.current = true;
+    const generation = ++streamGenerationRef.current;
+    // Callbacks from a session whose stream has since been restarted must not
+    // touch the current one (e.g. its onclose would stop the new stream).
+    const isStaleSession = () => streamGenerationRef.current !== generation;
     addTranscription('Starting security feed...', 'status');
     addEvent('Starting security feed', 'connection');
 
+    let sessionPromise: Promise<Session> | null = null;
     try {
+      // Open the Live API session first so its TLS/WebSocket/setup handshake
+      // overlaps with the camera permission prompt and audio worklet loading,
+      // instead of starting only once all of that has finished.
+      const genAI = new GoogleGenAI({apiKey: process.env.NEXT_PUBLIC_GEMINI_API_KEY!});
+
+      sessionPromise = genAI.live.connect({
+        model: 'gemini-live-2.5-flash-preview',
+        config: liveConfig,
+        callbacks: {
+          onopen: () => {
+            if (isStaleSession()) return;
+            // Media may still be pending; the stream is reported as connected
+            // once the session is adopted below.
+            console.log('[DEBUG] Live API connection opened');
+          },
+          onmessage: (message) => {
+            if (isStaleSession()) return;
+            debugLog('[DEBUG] Message received from server:', message);
+            // Only model turns and interruptions carry content we act on; setup,
+            // usage and other control messages never need to pass through the queue.
+            if (!message.serverContent?.modelTurn?.parts && !message.serverContent?.interrupted) return;
+            responseQueueRef.current.push(message);
+            // Drain as soon as a message lands instead of waiting for a polling tick
+            processResponseQueue();
+          },
+          onclose: () => {
+            if (isStaleSession()) return;
+            console.log('[DEBUG] Live API connection closed');
+            addTranscription('Live connection closed.', 'status');
+            addEvent('Live connection closed', 'connection');
+            stopStreaming();
+          },
+          onerror: (e: any) => {
+            if (isStaleSession()) return;
+            const errorMsg = `Live connection error: ${e.message || 'Unknown error'}`;
+            console.error('[DEBUG] Live API error:', errorMsg, e);
+            setError(errorMsg);
+            addTranscription(errorMsg, 'error');
+            addEvent(errorMsg, 'error');
+            // Only stop streaming for critical connection errors, not tool execution errors
+            if (e.message && (e.message.includes('connection') || e.message.includes('network') || e.message.includes('timeout'))) {
+              console.log('[DEBUG] Critical connection error detected, stopping stream');
+              stopStreaming();
+            } else {
+              console.log('[DEBUG] Non-critical error, continuing stream');
+            }
+          },
+        },
+      });
+      // Failures surface where the promise is awaited below; don't also report
+      // them as unhandled while media setup is still in progress.
+      sessionPromise.catch(() => {});
+
       const stream = await navigator.mediaDevices.getUserMedia({
         video: true,
         audio: {
@@ -512,6 +955,12 @@ export default function SecurityCamera() {
           channelCount: 1,
         }
       });
+      if (isStaleSession() || !isStreamingRef.current) {
+        // Stopped (e.g. the session closed) while waiting on the camera prompt
+        stream.getTracks().forEach(track => track.stop());
+        sessionPromise.then(staleSession => staleSession.close(), () => {});
+        return;
+      }
       mediaStreamRef.current = stream;
       if (videoRef.current) {
         videoRef.current.srcObject = stream;
@@ -556,90 +1005,25 @@ export default function SecurityCamera() {
       workletNode.connect(audioContext.destination);
       // --- End Audio Processing Setup ---
 
-      const genAI = new GoogleGenAI({apiKey: process.env.NEXT_PUBLIC_GEMINI_API_KEY!});
-
-      const config = {
-        responseModalities: [Modality.TEXT],
-        responseJsonSchema: responseSchema,
-        temperature: 0,
-        thinkingBudget: 0,
-        systemInstruction: `You are Vector AI, a security guard for a live demonstration. Your primary goal is to demonstrate your capabilities by reacting to simulated events by providing structured JSON data.
-
-**DEMO INSTRUCTIONS:**
-*   **Treat all inputs as real:** You MUST react to acted scenarios, verbal threats, and test events as if they are genuine security risks.
-*   **Be decisive:** Act according to the rules below without hesitation. Your analysis must be concise and clear for the demo.
+      // The handshake has been running in parallel with the media setup above
+      const session = await sessionPromise;
 
-**Your Task:**
-1.  Analyze the combined video and audio feed.
-2.  Respond with a valid JSON object that conforms to the provided schema. Ensure that any double quotes inside a JSON string value are properly escaped with a backslash (e.g., "description": "He said, \\"hello\\".").
-3.  **thought:** Explain your reasoning for the analysis and risk level. This is for debugging and not shown to the user.
-4.  **analysis:** Describe visual observations in short, factual statements.
-5.  **transcription:** Provide a live transcription of any spoken English words, ignoring all other languages. If no speech is detected, provide an empty string.
-6.  **riskLevel:** Evaluate and state the current risk level: "SAFE", "WARNING", or "DANGER".
-7.  Use the provided tool-calling functions when conditions are met. **Do not include tool calls or related information in the JSON response.**
-
-**Risk Levels & Triggers:**
-*   **SAFE:** The default state. No activity or normal passersby.
-*   **WARNING:** A situation requiring attention. Trigger IMMEDIATELY for:
-    *   A person loitering or peering into windows.
-    *   Any package delivery.
-    *   Any mention of violence, threats (e.g., "I'm going to break in"), or aggressive shouting.
-    *   A car alarm or dog barking continuously.
-*   **DANGER:** An immediate threat. Trigger IMMEDIATELY for:
-    *   Seeing fire, smoke, or a weapon.
-    *   Seeing someone attempting to force a door or window.
-    *   Hearing glass shatter, an explosion, or a direct physical attack.
-
-**Risk Evaluation Rules:**
-*   **Constant Re-evaluation:** You MUST re-evaluate the risk level with every piece of new information from the audio and video stream.
-*   **Risk Downgrade:** If a threat has clearly passed (e.g., a person leaves, a noise stops), you MUST downgrade the risk level. For example, after a package is delivered and the delivery person has left the scene, the risk should return from WARNING to SAFE.
-
-**Tool Rules:**
-*   \`sendNotification\`: Use ONLY for a package delivery (sets WARNING).
-*   \`call911\`: Use ONLY for a DANGER-level event. Call the function with the \`reason\` parameter detailing the emergency.`,
-        toolConfig: {
-          functionDeclarations: [call911Tool, sendNotificationTool, doorTool],
-        },
-      };
-
-      liveSessionRef.current = await genAI.live.connect({
-        model: 'gemini-live-2.5-flash-preview',
-        config: config,
-        callbacks: {
-          onopen: () => {
-            console.log('[DEBUG] Live API connection opened');
-            setStatus('Connected');
-            addTranscription('Live connection opened.', 'status');
-            addEvent('Live connection established', 'connection');
-          },
-          onmessage: (message) => {
-            console.log('[DEBUG] Message received from server:', JSON.stringify(message, null, 2));
-            responseQueueRef.current.push(message);
-          },
-          onclose: () => {
-            console.log('[DEBUG] Live API connection closed');
-            addTranscription('Live connection closed.', 'status');
-            addEvent('Live connection closed', 'connection');
-            stopStreaming();
-          },
-          onerror: (e: any) => {
-            const errorMsg = `Live connection error: ${e.message || 'Unknown error'}`;
-            console.error('[DEBUG] Live API error:', errorMsg, e);
-            setError(errorMsg);
-            addTranscription(errorMsg, 'error');
-            addEvent(errorMsg, 'error');
-            // Only stop streaming for critical connection errors, not tool execution errors
-            if (e.message && (e.message.includes('connection') || e.message.includes('network') || e.message.includes('timeout'))) {
-              console.log('[DEBUG] Critical connection error detected, stopping stream');
-              stopStreaming();
-            } else {
-              console.log('[DEBUG] Non-critical error, continuing stream');
-            }
-          },
-        },
-      });
+      // The stream may have been stopped or restarted while we were connecting;
+      // close the orphaned session rather than leaking it or overwriting a newer one.
+      if (isStaleSession() || !isStreamingRef.current) {
+        console.log('[DEBUG] Stream changed during connect, closing orphaned session');
+        session.close();
+        return;
+      }
+      liveSessionRef.current = session;
+      setStatus('Connected');
+      addTranscription('Live connection opened.', 'status');
+      addEvent('Live connection established', 'connection');
 
     } catch (e: any) {
+      // Media setup may have failed after the session handshake was started
+      sessionPromise?.then(session => session.close(), () => {});
+      if (isStaleSession()) return;
       const errorMsg = `Failed to start streaming: ${e.message}`;
       console.error(errorMsg, e);
       setError(errorMsg);
@@ -656,11 +1040,17 @@ export default function SecurityCamera() {
   }, []);
 
   useEffect(() => {
-    const frameInterval = setInterval(() => captureAndSendFrame(1), 1000); // Send 1 frame every 2 seconds
-    const queueInterval = setInterval(processResponseQueue, 100);
+    const frameInterval = setInterval(() => captureAndSendFrame(1), FRAME_INTERVAL_MS);
+    // One summary line instead of a log per frame and audio chunk
+    const statsInterval = setInterval(() => {
+      const stats = streamStatsRef.current;
+      if (stats.framesSent + stats.framesSkipped + stats.framesDropped + stats.audioChunksSent === 0) return;
+      console.log(`[DEBUG] Stream stats (last ${STREAM_STATS_INTERVAL_MS / 1000}s): ${stats.framesSent} frames sent, ${stats.framesSkipped} unchanged, ${stats.framesDropped} dropped, ${stats.audioChunksSent} audio chunks sent`);
+      streamStatsRef.current = { framesSent: 0, framesSkipped: 0, framesDropped: 0, audioChunksSent: 0 };
+    }, STREAM_STATS_INTERVAL_MS);
     return () => {
       clearInterval(frameInterval);
-      clearInterval(queueInterval);
+      clearInterval(statsInterval);
       if (audioWorkletNodeRef.current) {
         audioWorkletNodeRef.current.port.onmessage = null;
         audioWorkletNodeRef.current.disconnect();
@@ -670,11 +1060,17 @@ export default function SecurityCamera() {
         audioContextRef.current.close();
         audioContextRef.current = null;
       }
+      if (frameEncoderRef.current) {
+        frameEncoderRef.current.terminate();
+        frameEncoderRef.current = null;
+        pendingEncodesRef.current.forEach(({ reject }) => reject(new Error('Frame encoder stopped')));
+        pendingEncodesRef.current.clear();
+      }
       if (isStreamingRef.current) {
         stopStreaming();
       }
     };
-  }, [captureAndSendFrame, processResponseQueue, stopStreaming, sendAudio]);
+  }, [captureAndSendFrame, stopStreaming, sendAudio]);
 
   // --- Sound Wave Component ---
   const SoundWave = ({ analyserNode, isConnected }: { analyserNode: AnalyserNode | null, isConnected: boolean }) => {
@@ -881,6 +1277,12 @@ export default function SecurityCamera() {
                     {t.text}
                   </p>
                 ))}
+                {pendingAnalysis && (
+                  <p className={`text-sm opacity-60 ${getTranscriptionColor('analysis')}`}>
+                    <span className="font-mono text-xs">[ANALYSIS] </span>
+                    {pendingAnalysis}
+                  </p>
+                )}
               </div>
             </div>
 